@@ -46,6 +46,7 @@ training_config = {
     'w2': 1.0, 
     'w3': 1.0, 
     'use_multi_gpu' : False,   
+    'use_ddp' : True,          # With use_multi_gpu, train with DistributedDataParallel (one process per GPU, NCCL). Falls back to single-process multi-GPU where NCCL is unavailable (e.g. Windows).
     'num_gpus' : 1,               
     'warmup_epochs': 0, 
     'input_dim': 256,  
@@ -57,6 +58,7 @@ training_config = {
     'ground_truth_path': r"dataset/test_set/testset.csv",
     'checkpoint_path': r"out/checkpoints/checkpoint.pth", 
     'use_amp': True,
+    'log_every': 10,         # Print training progress every N batches (0 disables; the progress bar still updates every batch)
     'in_memory' : False # if true, use in memory data storage - requires a lot of system memory if your dataset is large and is no quicker than if using lazy loading - just dont ;)
 }
 
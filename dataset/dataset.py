@@ -8,6 +8,7 @@ import numpy as np
 import pickle
 import torch
 from torch.utils.data import Dataset, DataLoader, random_split
+from torch.utils.data.distributed import DistributedSampler
 from torch.nn.utils.rnn import pad_sequence
 from dataset.data_processing import load_data, process_folder  
 
@@ -210,6 +211,52 @@ class LazyAudioFacialDataset(Dataset):
         return src_batch, trg_batch
 
 
+# =============================================================================
+# CUDA PREFETCHER
+#
+# Wraps a DataLoader and copies the next (src, trg) batch to the GPU on a side
+# stream while the current batch is being processed. The DataLoaders below set
+# pin_memory=True so batches land in page-locked host memory; without it
+# .to(device, non_blocking=True) falls back to a synchronous copy.
+# On CPU it simply moves each batch.
+# =============================================================================
+class CUDAPrefetcher:
+    def __init__(self, dataloader, device):
+        self.dataloader = dataloader
+        self.device = device
+        use_cuda = device is not None and torch.device(device).type == 'cuda'
+        self.stream = torch.cuda.Stream(device=device) if use_cuda else None
+
+    def __len__(self):
+        return len(self.dataloader)
+
+    def __iter__(self):
+        if self.stream is None:
+            for src, trg in self.dataloader:
+                yield (src, trg) if self.device is None else (src.to(self.device), trg.to(self.device))
+            return
+
+        loader_iter = iter(self.dataloader)
+        next_batch = self._preload(loader_iter)
+        while next_batch is not None:
+            current_stream = torch.cuda.current_stream(self.device)
+            current_stream.wait_stream(self.stream)
+            src, trg = next_batch
+            # Allocated on the side stream but consumed on the compute stream.
+            src.record_stream(current_stream)
+            trg.record_stream(current_stream)
+            next_batch = self._preload(loader_iter)
+            yield src, trg
+
+    def _preload(self, loader_iter):
+        try:
+            src, trg = next(loader_iter)
+        except StopIteration:
+            return None
+        with torch.cuda.stream(self.stream):
+            return src.to(self.device, non_blocking=True), trg.to(self.device, non_blocking=True)
+
+
 # =============================================================================
 # HELPER: Get the Dataset Class Based on Configuration
 #
@@ -242,7 +289,8 @@ def prepare_dataloader_with_split(config, val_split=0.1):
         shuffle=True,
         collate_fn=DatasetClass.collate_fn,
         num_workers=4,         # adjust as needed
-        prefetch_factor=2
+        prefetch_factor=2,
+        pin_memory=True
     )
     val_dataloader = DataLoader(
         val_dataset,
@@ -250,10 +298,40 @@ def prepare_dataloader_with_split(config, val_split=0.1):
         shuffle=False,
         collate_fn=DatasetClass.collate_fn,
         num_workers=4,
-        prefetch_factor=2
+        prefetch_factor=2,
+        pin_memory=True
     )
     return train_dataset, val_dataset, train_dataloader, val_dataloader
 
+def prepare_distributed_dataloaders(config, train_dataset, val_dataset, rank, world_size):
+    """
+    Builds per-process DataLoaders for DistributedDataParallel training. The training
+    split is sharded across processes with a DistributedSampler; every process keeps
+    the full validation split.
+    """
+    DatasetClass = get_dataset_class(config)
+    train_sampler = DistributedSampler(train_dataset, num_replicas=world_size, rank=rank, shuffle=True)
+
+    train_dataloader = DataLoader(
+        train_dataset,
+        batch_size=config['batch_size'],
+        sampler=train_sampler,
+        collate_fn=DatasetClass.collate_fn,
+        num_workers=4,
+        prefetch_factor=2,
+        pin_memory=True
+    )
+    val_dataloader = DataLoader(
+        val_dataset,
+        batch_size=config['batch_size'],
+        shuffle=False,
+        collate_fn=DatasetClass.collate_fn,
+        num_workers=4,
+        prefetch_factor=2,
+        pin_memory=True
+    )
+    return train_dataloader, val_dataloader
+
 def prepare_dataloader(config):
     DatasetClass = get_dataset_class(config)
     dataset = DatasetClass(config)
@@ -263,7 +341,8 @@ def prepare_dataloader(config):
         shuffle=True,
         collate_fn=DatasetClass.collate_fn,
         num_workers=4,
-        prefetch_factor=2
+        prefetch_factor=2,
+        pin_memory=True
     )
     return dataset, dataloader
 
@@ -4,13 +4,14 @@
 
 import os
 import torch
+import torch.multiprocessing as mp
 
 from config import training_config as config
 from dataset.dataset import prepare_dataloader_with_split
 
-from utils.training_helpers import prepare_devices_and_models, load_or_initialize_models
+from utils.training_helpers import prepare_devices_and_models, load_or_initialize_models, should_use_ddp, get_ddp_world_size
 from utils.model_utils import prepare_training_components
-from utils.training_utils import train_model
+from utils.training_utils import train_model, train_model_ddp
 
 if __name__ == "__main__":
 
@@ -20,18 +21,23 @@ if __name__ == "__main__":
 
     train_dataset, val_dataset, train_dataloader, val_dataloader = prepare_dataloader_with_split(config, val_split=0.01)
 
-    devices, use_multi_gpu, models = prepare_devices_and_models(config)
-
-    criterion, optimizer, scheduler = prepare_training_components(config, models[0])
-    
-    models, optimizer, scheduler, start_epoch, batch_step = load_or_initialize_models(config, models, optimizer, scheduler, devices[0])
-    
-    # Start training.
-    train_model(
-        config, models[0], models[1], models[2], models[3],
-        train_dataloader, val_dataloader, criterion, optimizer, scheduler,
-        devices=devices, use_multi_gpu=use_multi_gpu, start_epoch=start_epoch, batch_step=batch_step
-    )
+    if should_use_ddp(config):
+        # One process per GPU; gradients are all-reduced by DistributedDataParallel.
+        world_size = get_ddp_world_size(config)
+        mp.spawn(train_model_ddp, args=(world_size, config, train_dataset, val_dataset), nprocs=world_size, join=True)
+    else:
+        devices, use_multi_gpu, models = prepare_devices_and_models(config)
+
+        criterion, optimizer, scheduler = prepare_training_components(config, models[0])
+        
+        models, optimizer, scheduler, start_epoch, batch_step = load_or_initialize_models(config, models, optimizer, scheduler, devices[0])
+        
+        # Start training.
+        train_model(
+            config, models[0], models[1], models[2], models[3],
+            train_dataloader, val_dataloader, criterion, optimizer, scheduler,
+            devices=devices, use_multi_gpu=use_multi_gpu, start_epoch=start_epoch, batch_step=batch_step
+        )
 
 
 
@@ -6,8 +6,19 @@ import torch
 
 from datetime import datetime
 from utils.validation import generate_and_save_facial_data
+from utils.io_utils import submit_io
 
-def save_checkpoint(model, optimizer, scheduler, epoch, batch_step, config):
+def _state_to_cpu(state):
+    """Detached CPU copy of a (nested) state dict, safe to write while training continues."""
+    if isinstance(state, torch.Tensor):
+        return state.detach().to('cpu', copy=True)
+    if isinstance(state, dict):
+        return {k: _state_to_cpu(v) for k, v in state.items()}
+    if isinstance(state, (list, tuple)):
+        return type(state)(_state_to_cpu(v) for v in state)
+    return state
+
+def _checkpoint_state(model, optimizer, scheduler, epoch, batch_step, config, io_pool=None):
     checkpoint = {
         'model_state_dict': model.state_dict(),
         'optimizer_state_dict': optimizer.state_dict(),
@@ -17,8 +28,16 @@ def save_checkpoint(model, optimizer, scheduler, epoch, batch_step, config):
         'config': config
     }
 
-    checkpoint_path = config['checkpoint_path']
-    
+    if io_pool is not None:
+        # Snapshot to CPU now; the live tensors keep changing once training resumes.
+        checkpoint = _state_to_cpu(checkpoint)
+    return checkpoint
+
+def save_checkpoint(model, optimizer, scheduler, epoch, batch_step, config, io_pool=None):
+    checkpoint = _checkpoint_state(model, optimizer, scheduler, epoch, batch_step, config, io_pool)
+    return submit_io(io_pool, _write_checkpoint, checkpoint, config['checkpoint_path'])
+
+def _write_checkpoint(checkpoint, checkpoint_path):
     if os.path.exists(checkpoint_path):
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         backup_dir = os.path.join(os.path.dirname(checkpoint_path), f"backup_{timestamp}")
@@ -42,7 +61,12 @@ def load_checkpoint(checkpoint_path, model, optimizer, scheduler, device):
 
     model.load_state_dict(checkpoint['model_state_dict'])
 
+    # load_state_dict replaces the param groups wholesale; keep the 'fused' setting the
+    # optimizer was built with so older (unfused) checkpoints stay compatible with AMP.
+    fused_flags = [group.get('fused') for group in optimizer.param_groups]
     optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
+    for group, fused in zip(optimizer.param_groups, fused_flags):
+        group['fused'] = fused
     scheduler.load_state_dict(checkpoint['scheduler_state_dict'])
     
     epoch = checkpoint['epoch']
@@ -50,8 +74,19 @@ def load_checkpoint(checkpoint_path, model, optimizer, scheduler, device):
     
     return epoch, batch_step, model, optimizer, scheduler
 
-def save_checkpoint_and_data(epoch, model, optimizer, scheduler, batch_step, config, lock, device):
+def save_checkpoint_and_data(epoch, model, optimizer, scheduler, batch_step, config, lock, device, io_pool=None):
+    """
+    Saves the checkpoint and model weights, then generates the validation facial data.
+    With an io_pool the writes run in the background and their futures are returned;
+    pass them to wait_for_io before the next checkpoint so write failures stop training.
+    """
+    pending_writes = []
     if (epoch + 1) % 1 == 0:
-        save_checkpoint(model, optimizer, scheduler, epoch, batch_step, config)
-        torch.save(model.state_dict(), config['model_path'])
-        generate_and_save_facial_data(epoch, config['audio_path'], model, config['ground_truth_path'], lock, device)
\ No newline at end of file
+        checkpoint = _checkpoint_state(model, optimizer, scheduler, epoch, batch_step, config, io_pool)
+        checkpoint_write = submit_io(io_pool, _write_checkpoint, checkpoint, config['checkpoint_path'])
+        # Reuse the checkpoint's (CPU) weights rather than snapshotting the model twice.
+        model_write = submit_io(io_pool, torch.save, checkpoint['model_state_dict'], config['model_path'])
+        if io_pool is not None:
+            pending_writes = [checkpoint_write, model_write]
+        generate_and_save_facial_data(epoch, config['audio_path'], model, config['ground_truth_path'], lock, device)
+    return pending_writes
\ No newline at end of file
@@ -1,7 +1,33 @@
 import numpy as np
 import pandas as pd
 
-def save_generated_data_as_csv(generated, output_path, include_emotion_dimensions=False): #lite version needs to keep this false.
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pcsv
+except ImportError:  # pyarrow is optional; fall back to pandas for writing
+    pa = None
+
+def _zero_pad(values, width):
+    return np.char.zfill(values.astype(str), width)
+
+def generate_timecodes(frame_count, frame_rate=60):
+    """Build HH:mm:ss:ff.mmm timecodes for frame_count frames using integer array arithmetic."""
+    if frame_count == 0:
+        # np.char.zfill cannot handle empty arrays
+        return np.empty(0, dtype='U15')
+    frame_indices = np.arange(frame_count, dtype=np.int64)
+    hours = frame_indices // (frame_rate * 3600)
+    minutes = (frame_indices // (frame_rate * 60)) % 60
+    seconds = (frame_indices // frame_rate) % 60
+    frame_numbers = frame_indices % frame_rate
+    milliseconds = (frame_numbers * 1000) // frame_rate
+
+    timecodes = _zero_pad(hours, 2)
+    for separator, values, width in ((':', minutes, 2), (':', seconds, 2), (':', frame_numbers, 2), ('.', milliseconds, 3)):
+        timecodes = np.char.add(np.char.add(timecodes, separator), _zero_pad(values, width))
+    return timecodes
+
+def save_generated_data_as_csv(generated, output_path, include_emotion_dimensions=False, decimals=4): #lite version needs to keep this false.
     # Base columns (Blendshape data)
     base_columns = [
         'Timecode', 'BlendshapeCount', 'EyeBlinkLeft', 'EyeLookDownLeft', 'EyeLookInLeft', 'EyeLookOutLeft', 'EyeLookUpLeft', 
@@ -18,8 +44,8 @@ def save_generated_data_as_csv(generated, output_path, include_emotion_dimension
     # Emotion columns (optional)
     emotion_columns = ['Angry', 'Disgusted', 'Fearful', 'Happy', 'Neutral', 'Sad', 'Surprised']
 
-    # Convert the generated list to a NumPy array
-    generated = np.array(generated)
+    # Convert the generated list to a float32 NumPy array (ample precision for blendshape values)
+    generated = np.asarray(generated, dtype=np.float32)
 
     # Ensure input has exactly 68 columns (61 blendshapes + 7 emotions)
     if generated.shape[1] not in [68, 61]:
@@ -32,32 +58,38 @@ def save_generated_data_as_csv(generated, output_path, include_emotion_dimension
         selected_data = generated  # Keep all 68 columns
     else:
         selected_columns = base_columns  # Keep only the first 61 blendshape columns
-        selected_data = generated[:, :61]  # Fix: Slice only the first 61 columns
+        selected_data = np.ascontiguousarray(generated[:, :61])  # Fix: Slice only the first 61 columns
 
     # Generate timecodes
     frame_count = generated.shape[0]
     frame_rate = 60  # 60 FPS
-    frame_duration = 1 / frame_rate  # Duration of each frame in seconds
 
     # Create timecodes in the HH:mm:ss:ff.mmm format
-    timecodes = []
-    for i in range(frame_count):
-        total_seconds = i * frame_duration
-        hours, remainder = divmod(total_seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        milliseconds = (seconds - int(seconds)) * 1000
-        frame_number = int(milliseconds / (1000 / frame_rate))
-        timecode = f"{int(hours):02}:{int(minutes):02}:{int(seconds):02}:{frame_number:02}.{int(milliseconds):03}"
-        timecodes.append(timecode)
-
-    # Add timecodes and blendshape counts
-    timecodes = np.array(timecodes).reshape(-1, 1)
-    blendshape_counts = np.full((frame_count, 1), selected_data.shape[1])
-
-    # Stack the data together
-    data = np.hstack((timecodes, blendshape_counts, selected_data))
-
-    # Create a DataFrame and save to CSV
-    df = pd.DataFrame(data, columns=selected_columns)
-    df.to_csv(output_path, index=False)
+    timecodes = generate_timecodes(frame_count, frame_rate)
+
+    # Build the DataFrame column by column so each column keeps its native dtype
+    columns = {
+        'Timecode': timecodes,
+        'BlendshapeCount': np.full(frame_count, selected_data.shape[1], dtype=np.int32),
+    }
+    # Round once and keep the columns numeric for the writers; adding 0.0 turns the -0.0
+    # left by rounding small negatives into 0.0.
+    selected_data = np.round(selected_data, decimals)
+    selected_data += 0.0
+    for index, column in enumerate(selected_columns[2:]):
+        columns[column] = selected_data[:, index]
+
+    # Write straight from the columns with pyarrow if available, otherwise via pandas.
+    # pyarrow prints the shortest repr of each value (0.879) where pandas pads to
+    # `decimals` places (0.8790); both parse back to the same number.
+    if pa is not None:
+        table = pa.table(columns)
+        # pyarrow always quotes header names, so write the header line ourselves to keep
+        # the plain `Timecode,BlendshapeCount,...` header that pandas produces.
+        with open(output_path, 'wb') as csv_file:
+            csv_file.write((','.join(columns) + '\n').encode('utf-8'))
+            pcsv.write_csv(table, csv_file, write_options=pcsv.WriteOptions(include_header=False, quoting_style='none'))
+    else:
+        df = pd.DataFrame(columns)
+        df.to_csv(output_path, index=False, float_format=f'%.{decimals}f')
     print(f"Generated data saved to {output_path}")
\ No newline at end of file
@@ -0,0 +1,33 @@
+# io_utils.py
+# This software is licensed under a **dual-license model**
+# For individuals and businesses earning **under $1M per year**, this software is licensed under the **MIT License**
+# Businesses or organizations with **annual revenue of $1,000,000 or more** must obtain permission to use this software commercially.
+
+from concurrent.futures import ThreadPoolExecutor
+
+def create_io_pool():
+    """Single background thread for plot and checkpoint writes, so they stay ordered."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="io")
+
+def _report_io_error(future):
+    exc = future.exception()
+    if exc is not None:
+        print(f"Background write failed: {exc!r}")
+
+def submit_io(io_pool, fn, *args, **kwargs):
+    """Run fn on the background I/O thread if a pool is given, otherwise inline."""
+    if io_pool is None:
+        return fn(*args, **kwargs)
+    return io_pool.submit(fn, *args, **kwargs)
+
+def submit_io_nowait(io_pool, fn, *args, **kwargs):
+    """Like submit_io, for writes nobody waits on: a background failure is printed instead."""
+    future = submit_io(io_pool, fn, *args, **kwargs)
+    if io_pool is not None:
+        future.add_done_callback(_report_io_error)
+    return future
+
+def wait_for_io(futures):
+    """Block until the given background writes finish, re-raising the first failure."""
+    for future in futures:
+        future.result()
@@ -6,9 +6,11 @@
 import os
 import torch
 import torch.nn as nn
+import torch.distributed as dist
 
 from torch.cuda.amp import GradScaler, autocast
-from utils.model_utils import build_model, calculate_gradient_norm, init_weights
+from torch._utils import _flatten_dense_tensors, _unflatten_dense_tensors
+from utils.model_utils import build_model, init_model_weights, cached_parameters
 from utils.checkpoint_utils import load_checkpoint
 
 def prepare_devices_and_models(config):
@@ -36,6 +38,53 @@ def prepare_devices_and_models(config):
     return devices, use_multi_gpu, (model_0, model_1, model_2, model_3)
 
 
+def get_ddp_world_size(config):
+    """Number of DDP processes to launch: one per requested (and visible) GPU."""
+    return min(config.get('num_gpus', 1), torch.cuda.device_count())
+
+
+def should_use_ddp(config):
+    """
+    Returns True if multi-GPU training should run under DistributedDataParallel
+    (one process per GPU over NCCL). Platforms without NCCL (e.g. Windows) fall back
+    to the single-process multi-GPU path.
+    """
+    return (
+        config.get('use_multi_gpu', False)
+        and config.get('use_ddp', True)
+        and get_ddp_world_size(config) > 1
+        and dist.is_available()
+        and dist.is_nccl_available()
+    )
+
+
+def setup_distributed(rank, world_size):
+    """Initializes the NCCL process group for this rank and binds it to its GPU."""
+    os.environ.setdefault('MASTER_ADDR', 'localhost')
+    os.environ.setdefault('MASTER_PORT', '29500')
+    dist.init_process_group('nccl', rank=rank, world_size=world_size)
+    torch.cuda.set_device(rank)
+
+
+def cleanup_distributed():
+    """Tears down the process group created by setup_distributed."""
+    if dist.is_initialized():
+        dist.destroy_process_group()
+
+
+def prepare_ddp_model(config, rank):
+    """
+    Builds the single model owned by a DDP process.
+
+    Returns:
+        device (torch.device): The GPU bound to this rank.
+        model (nn.Module): The unwrapped model on that device.
+    """
+    device = torch.device(f'cuda:{rank}')
+    model = build_model(config, device)
+    return device, model
+
+
 def load_or_initialize_models(config, models, optimizer, scheduler, device):
     """
     Loads a checkpoint if in resume mode, or initializes the models if not.
@@ -64,7 +113,7 @@ def load_or_initialize_models(config, models, optimizer, scheduler, device):
                 model.load_state_dict(model_0.state_dict())
     else:
         # Initialize model_0 and sync secondary models.
-        model_0.apply(init_weights)
+        init_model_weights(model_0)
         for model in (model_1, model_2, model_3):
             if model is not None:
                 model.load_state_dict(model_0.state_dict())
@@ -85,21 +134,19 @@ def _compute_loss_single_gpu(model, src, trg, criterion, current_step, total_ste
 def _backward_and_step_single_gpu(loss, model, optimizer, clip, use_amp, grad_scaler):
     """
     Backpropagates, clips gradients, and takes an optimizer step.
-    Returns the computed gradient norm.
+    Returns the pre-clip gradient norm reported by clip_grad_norm_.
     """
     if use_amp:
         grad_scaler.scale(loss).backward()
         grad_scaler.unscale_(optimizer)
-        total_norm = calculate_gradient_norm(model)  # <-- Assumes calculate_gradient_norm is defined elsewhere
-        torch.nn.utils.clip_grad_norm_(model.parameters(), clip)
+        total_norm = torch.nn.utils.clip_grad_norm_(cached_parameters(model), clip)
         grad_scaler.step(optimizer)
         grad_scaler.update()
     else:
         loss.backward()
-        total_norm = calculate_gradient_norm(model)  # <-- Assumes calculate_gradient_norm is defined elsewhere
-        torch.nn.utils.clip_grad_norm_(model.parameters(), clip)
+        total_norm = torch.nn.utils.clip_grad_norm_(cached_parameters(model), clip)
         optimizer.step()
-    return total_norm
+    return total_norm.item()
 
 
 
@@ -131,8 +178,8 @@ def _backward_and_step_multi_gpu(losses, models, optimizer, devices, clip, use_a
     Backpropagates on each GPU loss, unscales (if AMP is used), synchronizes gradients,
     averages them in a vectorized fashion, clips gradients, and steps the optimizer.
     
-    This version manually vectorizes the gradient averaging by stacking gradients
-    across devices and computing their mean.
+    Gradients are flattened into one contiguous buffer per device, so the averaging
+    is a single transfer per device plus one stacked mean rather than one per parameter.
     
     Args:
         losses (list): List of loss tensors (one per model).
@@ -154,37 +201,36 @@ def _backward_and_step_multi_gpu(losses, models, optimizer, devices, clip, use_a
             grad_scaler.scale(loss).backward()
         # Unscale the gradients in the optimizer.
         grad_scaler.unscale_(optimizer)
-        scale = grad_scaler.get_scale()
-        # Manually unscale gradients for models[1:].
+        inv_scale = 1.0 / grad_scaler.get_scale()
+        # Manually unscale gradients for models[1:] with one fused multiply per model.
         for model in models[1:]:
-            for p in model.parameters():
-                if p.grad is not None:
-                    # Manually divide the gradient by the scale.
-                    p.grad.data = p.grad.data / scale
+            grads = [p.grad for p in cached_parameters(model) if p.grad is not None]
+            if grads:
+                torch._foreach_mul_(grads, inv_scale)
     else:
         for loss in losses:
             loss.backward()
     
-    # --- Synchronize Devices ---
-    for device in devices:
-        torch.cuda.synchronize(device)
-    
-    # --- Vectorized Gradient Averaging ---
-    # For each group of corresponding parameters from all models:
-    for param_tuple in zip(*[list(model.parameters()) for model in models]):
-        # Only process parameters that have valid gradients in all models.
-        if all(p.grad is not None for p in param_tuple):
-            # Move each gradient to devices[0] and stack them.
-            grads = [p.grad.data.to(devices[0]) for p in param_tuple]
-            stacked_grads = torch.stack(grads, dim=0)  # Shape: (n, *param_shape)
-            # Compute the average gradient (vectorized).
-            avg_grad = torch.mean(stacked_grads, dim=0)
-            # Update the primary model's gradient with the averaged value.
-            param_tuple[0].grad.data.copy_(avg_grad)
+    # --- Flattened Gradient Averaging ---
+    # Only average parameters that have valid gradients in all models.
+    param_lists = [cached_parameters(model) for model in models]
+    synced = [i for i, param_tuple in enumerate(zip(*param_lists)) if all(p.grad is not None for p in param_tuple)]
+    if synced:
+        primary_grads = [param_lists[0][i].grad for i in synced]
+        # One contiguous buffer per device, one transfer each to devices[0], one mean.
+        # A cross-device copy already waits on the current streams of both devices, so
+        # no torch.cuda.synchronize() is needed before the transfers.
+        flat_grads = [_flatten_dense_tensors(primary_grads)]
+        for params in param_lists[1:]:
+            flat = _flatten_dense_tensors([params[i].grad for i in synced])
+            flat_grads.append(flat.to(devices[0], non_blocking=True))
+        avg_flat = torch.stack(flat_grads, dim=0).mean(dim=0)
+        # Update the primary model's gradients with the averaged values.
+        torch._foreach_copy_(primary_grads, _unflatten_dense_tensors(avg_flat, primary_grads))
     
     # --- Gradient Clipping and Optimizer Step ---
-    pre_clip_norm = calculate_gradient_norm(models[0])  # <-- Assumes calculate_gradient_norm is defined
-    torch.nn.utils.clip_grad_norm_(models[0].parameters(), clip)
+    # clip_grad_norm_ already computes the total norm, so reuse it rather than walking the grads twice.
+    pre_clip_norm = torch.nn.utils.clip_grad_norm_(cached_parameters(models[0]), clip)
     
     if use_amp:
         grad_scaler.step(optimizer)
@@ -192,21 +238,7 @@ def _backward_and_step_multi_gpu(losses, models, optimizer, devices, clip, use_a
     else:
         optimizer.step()
     
-    return pre_clip_norm
-
-def _sync_models(models):
-    """
-    Synchronizes parameters from the primary model (models[0]) to all other models
-    and zeros their gradients.
-    """
-    for m in models[1:]:
-        for p0, p_other in zip(models[0].parameters(), m.parameters()):
-            p_other.data.copy_(p0.data.to(p_other.device))
-    # Zero gradients for models[1:].
-    for m in models[1:]:
-        for p in m.parameters():
-            if p.grad is not None:
-                p.grad.zero_()
+    return pre_clip_norm.item()
 
 
 
@@ -214,12 +246,19 @@ def _sync_models(models):
 
 
 
-def print_training_progress(batch_idx, total_norm, batch_loss, batch_step, epoch, total_epochs, dataloader_len, pbar):
-    """Print training progress and update the progress bar."""
-    print(f"Batch {batch_idx}, Gradient Norm: {total_norm}")
+def print_training_progress(batch_idx, total_norm, batch_loss, batch_step, epoch, total_epochs, dataloader_len, pbar, log_every=10):
+    """
+    Update the progress bar every batch and print training progress every `log_every` batches.
+    A `log_every` of 0 or less turns the printing off.
+    """
     if pbar is not None:
         pbar.update(1)
-    print(f"Step [{batch_step}/{pbar.total}], Epoch [{epoch + 1}/{total_epochs}], Batch [{batch_idx + 1}/{dataloader_len}], Current Loss: {batch_loss:.4f}")
+    if log_every <= 0 or batch_idx % log_every != 0:
+        return
+    total_steps = pbar.total if pbar is not None else '?'
+    # One formatted write per logged batch instead of two prints every batch.
+    print(f"Batch {batch_idx}, Gradient Norm: {total_norm}\n"
+          f"Step [{batch_step}/{total_steps}], Epoch [{epoch + 1}/{total_epochs}], Batch [{batch_idx + 1}/{dataloader_len}], Current Loss: {batch_loss:.4f}")
 
 def print_epoch_summary(epoch, total_epochs, epoch_loss, dataloader_len, epoch_time):
     """Print the summary of the epoch."""
@@ -13,6 +13,7 @@ import multiprocessing
 from tqdm import tqdm
 import torch.distributed as dist
 from torch.cuda.amp import GradScaler, autocast
+from torch.nn.parallel import DistributedDataParallel as DDP
 
 from utils.training_helpers import (
     _compute_loss_single_gpu,
@@ -20,11 +21,17 @@ from utils.training_helpers import (
     _compute_losses_multi_gpu,
     _backward_and_step_multi_gpu,
     print_epoch_summary,
-    print_training_progress
+    print_training_progress,
+    prepare_ddp_model,
+    load_or_initialize_models,
+    setup_distributed,
+    cleanup_distributed
 )
 
 from utils.checkpoint_utils import save_checkpoint_and_data
-from utils.model_utils import save_final_model, calculate_gradient_norm, count_parameters, _sync_models
+from utils.io_utils import create_io_pool, submit_io_nowait, wait_for_io
+from utils.model_utils import save_final_model, count_parameters, prepare_training_components, _sync_models
+from dataset.dataset import prepare_distributed_dataloaders, CUDAPrefetcher
 from utils.validation import save_gradient_norm_plot, save_loss_plot, _run_validation_single_gpu, _run_validation_multi_gpu
 
 def train_model(config, model_0, model_1, model_2, model_3, dataloader, val_dataloader, criterion, optimizer, scheduler, devices, use_multi_gpu=False, start_epoch=0, batch_step=0):
@@ -35,7 +42,9 @@ def train_model(config, model_0, model_1, model_2, model_3, dataloader, val_data
     count_parameters(model_0)
     device0, use_amp, scaler = devices[0], config.get('use_amp', True), GradScaler() if config.get('use_amp', True) else None
 
-    with tqdm(total=total_batches, desc="Training", dynamic_ncols=True) as pbar:
+    # Plots and checkpoint writes run on a background thread so the GPU is not left idle.
+    with tqdm(total=total_batches, desc="Training", dynamic_ncols=True) as pbar, create_io_pool() as io_pool:
+        pending_writes = []
         for epoch in range(start_epoch, n_epochs):
             if use_multi_gpu:
                 # Gather models and corresponding devices that are not None:
@@ -44,21 +53,77 @@ def train_model(config, model_0, model_1, model_2, model_3, dataloader, val_data
                 batch_step = train_one_epoch_multi_gpu(
                     epoch, models_list, dataloader, criterion, optimizer, used_devices, clip=2.0,
                     batch_step=batch_step, pbar=pbar, total_epochs=n_epochs, use_amp=use_amp,
-                    grad_scaler=scaler, val_dataloader=val_dataloader, validation_interval=20
+                    grad_scaler=scaler, val_dataloader=val_dataloader, validation_interval=20, io_pool=io_pool,
+                    log_every=config.get('log_every', 10)
                 )
             else:
                 batch_step = train_one_epoch(
                     epoch, model=model_0, dataloader=dataloader, criterion=criterion, optimizer=optimizer,
                     device=device0, clip=2.0, batch_step=batch_step, pbar=pbar, total_epochs=n_epochs,
-                    use_amp=use_amp, grad_scaler=scaler, val_dataloader=val_dataloader, validation_interval=20
+                    use_amp=use_amp, grad_scaler=scaler, val_dataloader=val_dataloader, validation_interval=20, io_pool=io_pool,
+                    log_every=config.get('log_every', 10)
                 )
             scheduler.step()
-            save_checkpoint_and_data(epoch, model_0, optimizer, scheduler, batch_step, config, lock, device0)
+            # Surface a failed checkpoint write before writing (and backing up over) the next one.
+            wait_for_io(pending_writes)
+            pending_writes = save_checkpoint_and_data(epoch, model_0, optimizer, scheduler, batch_step, config, lock, device0, io_pool)
+        wait_for_io(pending_writes)
     save_final_model(model_0)
     return batch_step
 
 
 
+def train_model_ddp(rank, world_size, config, train_dataset, val_dataset):
+    """
+    Per-process entry point for DistributedDataParallel training, launched with
+    torch.multiprocessing.spawn (one process per GPU). Gradients are all-reduced
+    inside loss.backward(), so each rank runs the ordinary single-GPU epoch loop.
+    Rank 0 owns logging, plots, checkpoints and the final model.
+    """
+    setup_distributed(rank, world_size)
+    try:
+        is_main_process = rank == 0
+        dataloader, val_dataloader = prepare_distributed_dataloaders(config, train_dataset, val_dataset, rank, world_size)
+
+        device, model = prepare_ddp_model(config, rank)
+        criterion, optimizer, scheduler = prepare_training_components(config, model)
+        (model, _, _, _), optimizer, scheduler, start_epoch, batch_step = load_or_initialize_models(
+            config, (model, None, None, None), optimizer, scheduler, device
+        )
+        # DDP broadcasts rank 0's weights on construction, so every rank starts identical.
+        ddp_model = DDP(model, device_ids=[rank])
+
+        n_epochs = config['n_epochs']
+        total_batches = n_epochs * len(dataloader)
+        lock = multiprocessing.Lock()
+        if is_main_process:
+            count_parameters(model)
+        use_amp, scaler = config.get('use_amp', True), GradScaler() if config.get('use_amp', True) else None
+
+        with tqdm(total=total_batches, desc="Training", dynamic_ncols=True, disable=not is_main_process) as pbar, create_io_pool() as io_pool:
+            pending_writes = []
+            for epoch in range(start_epoch, n_epochs):
+                dataloader.sampler.set_epoch(epoch)
+                batch_step = train_one_epoch(
+                    epoch, model=ddp_model, dataloader=dataloader, criterion=criterion, optimizer=optimizer,
+                    device=device, clip=2.0, batch_step=batch_step, pbar=pbar, total_epochs=n_epochs,
+                    use_amp=use_amp, grad_scaler=scaler, val_dataloader=val_dataloader, validation_interval=20,
+                    is_main_process=is_main_process, io_pool=io_pool, log_every=config.get('log_every', 10)
+                )
+                scheduler.step()
+                if is_main_process:
+                    wait_for_io(pending_writes)
+                    pending_writes = save_checkpoint_and_data(epoch, model, optimizer, scheduler, batch_step, config, lock, device, io_pool)
+                dist.barrier()
+            wait_for_io(pending_writes)
+        if is_main_process:
+            save_final_model(model)
+        return batch_step
+    finally:
+        cleanup_distributed()
+
+
+
 def train_one_epoch(
     epoch,
     model,
@@ -73,11 +138,14 @@ def train_one_epoch(
     use_amp=False,              # Whether to enable mixed precision
     grad_scaler=None,           # torch.cuda.amp.GradScaler object
     val_dataloader=None,        # Validation DataLoader
-    validation_interval=20      # Validation step every N training batches
+    validation_interval=20,     # Validation step every N training batches
+    is_main_process=True,       # Only the main process logs and saves plots (DDP)
+    io_pool=None,               # Background executor for plot writes (None = write inline)
+    log_every=10                # Print training progress every N batches
 ):
     """
     Trains the model for one epoch on a single GPU, with optional mixed precision and
-    periodic validation.
+    periodic validation. Also used per-rank under DistributedDataParallel.
     """
     if use_amp and grad_scaler is None:
         raise ValueError("use_amp=True but no GradScaler was provided!")
@@ -93,20 +161,22 @@ def train_one_epoch(
     if val_dataloader is not None:
         val_iter = iter(val_dataloader)
 
-    for batch_idx, (src, trg) in enumerate(dataloader):
-        src, trg = src.to(device), trg.to(device)
-        optimizer.zero_grad()
+    # Batches arrive already on `device`; the next copy overlaps the current step.
+    for batch_idx, (src, trg) in enumerate(CUDAPrefetcher(dataloader, device)):
+        optimizer.zero_grad(set_to_none=True)
 
         current_step = batch_step + (epoch * len(dataloader)) + batch_idx
         loss = _compute_loss_single_gpu(model, src, trg, criterion, current_step, total_steps, use_amp)
 
         total_norm = _backward_and_step_single_gpu(loss, model, optimizer, clip, use_amp, grad_scaler)
 
+        batch_loss = loss.item()
         train_steps.append(batch_step)
-        train_losses.append(loss.item())
-        print_training_progress(batch_idx, total_norm, loss.item(), batch_step, epoch, total_epochs, len(dataloader), pbar)
+        train_losses.append(batch_loss)
+        if is_main_process:
+            print_training_progress(batch_idx, total_norm, batch_loss, batch_step, epoch, total_epochs, len(dataloader), pbar, log_every)
         gradient_norms.append(total_norm)
-        epoch_loss += loss.item()
+        epoch_loss += batch_loss
         batch_step += 1
 
         if val_dataloader is not None and (batch_idx % validation_interval == 0):
@@ -116,14 +186,16 @@ def train_one_epoch(
                 val_iter = iter(val_dataloader)
                 val_batch = next(val_iter)
             val_loss = _run_validation_single_gpu(model, val_batch, device, use_amp, criterion)
-            print(f"[Epoch {epoch} - Batch {batch_idx}] Validation Loss: {val_loss.item():.4f}")
+            if is_main_process:
+                print(f"[Epoch {epoch} - Batch {batch_idx}] Validation Loss: {val_loss.item():.4f}")
             val_steps.append(batch_step)
             val_losses.append(val_loss.item())
 
     end_time = time.time()
-    print_epoch_summary(epoch, total_epochs, epoch_loss, len(dataloader), end_time - start_time)
-    save_loss_plot(epoch, train_steps, train_losses, val_steps, val_losses, save_dir="dataset/validation_plots/loss")
-    save_gradient_norm_plot(epoch, gradient_norms, save_dir="dataset/validation_plots/gradient_norms")
+    if is_main_process:
+        print_epoch_summary(epoch, total_epochs, epoch_loss, len(dataloader), end_time - start_time)
+        submit_io_nowait(io_pool, save_loss_plot, epoch, list(train_steps), list(train_losses), list(val_steps), list(val_losses), save_dir="dataset/validation_plots/loss")
+        submit_io_nowait(io_pool, save_gradient_norm_plot, epoch, list(gradient_norms), save_dir="dataset/validation_plots/gradient_norms")
     
     return batch_step
 
@@ -141,7 +213,9 @@ def train_one_epoch_multi_gpu(
     use_amp=False,
     grad_scaler=None,
     val_dataloader=None,
-    validation_interval=20
+    validation_interval=20,
+    io_pool=None,
+    log_every=10
 ):
     """
     Trains the supplied models for one epoch on multiple GPUs (up to 4) with mixed precision support.
@@ -176,22 +250,21 @@ def train_one_epoch_multi_gpu(
             inputs.append(src.to(devices[i], non_blocking=True))
             targets.append(trg.to(devices[i], non_blocking=True))
 
-        optimizer.zero_grad()
+        optimizer.zero_grad(set_to_none=True)
         current_step = batch_step + (epoch * steps_per_epoch) + step_idx
         losses = _compute_losses_multi_gpu(models, inputs, targets, criterion, current_step, total_steps, use_amp)
         pre_clip_norm = _backward_and_step_multi_gpu(losses, models, optimizer, devices, clip, use_amp, grad_scaler)
 
-        print_training_progress(step_idx, pre_clip_norm, sum(l.item() for l in losses)/n,
-                                  batch_step, epoch, total_epochs, steps_per_epoch, pbar)
+        batch_loss = sum(l.item() for l in losses) / n
+        print_training_progress(step_idx, pre_clip_norm, batch_loss,
+                                  batch_step, epoch, total_epochs, steps_per_epoch, pbar, log_every)
         gradient_norms.append(pre_clip_norm)
 
         _sync_models(models)
 
-        batch_loss = sum(l.item() for l in losses) / n
         epoch_loss += batch_loss
         train_steps.append(batch_step)
         train_losses.append(batch_loss)
-        gradient_norms.append(calculate_gradient_norm(models[0]))  
         batch_step += 1
 
         if val_dataloader is not None and (step_idx % validation_interval == 0):
@@ -207,8 +280,8 @@ def train_one_epoch_multi_gpu(
 
     end_time = time.time()
     print_epoch_summary(epoch, total_epochs, epoch_loss, steps_per_epoch, end_time - start_time)
-    save_gradient_norm_plot(epoch, gradient_norms, save_dir="dataset/validation_plots/gradient_norms")
-    save_loss_plot(epoch, train_steps, train_losses, val_steps, val_losses, save_dir="dataset/validation_plots/loss")
+    submit_io_nowait(io_pool, save_gradient_norm_plot, epoch, list(gradient_norms), save_dir="dataset/validation_plots/gradient_norms")
+    submit_io_nowait(io_pool, save_loss_plot, epoch, list(train_steps), list(train_losses), list(val_steps), list(val_losses), save_dir="dataset/validation_plots/loss")
 
     return batch_step
 
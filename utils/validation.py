@@ -7,7 +7,8 @@ import os
 import multiprocessing
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import torch
 from torch.cuda.amp import autocast
 from utils.audio.extraction.extract_features import extract_audio_features
@@ -125,19 +126,35 @@ def save_comparison_stats(generated_data_path, ground_truth_path, output_stats_p
 
 
 
+# Training plots are redrawn every epoch, so keep one Agg figure per plot instead of
+# creating (and tearing down) a new pyplot figure each time.
+_plot_figures = {}
+
+def _get_plot_figure(name):
+    """Return the cached figure for the named plot, cleared and ready to redraw."""
+    fig = _plot_figures.get(name)
+    if fig is None:
+        fig = Figure(figsize=(10, 6))
+        FigureCanvasAgg(fig)
+        _plot_figures[name] = fig
+    else:
+        fig.clear()
+    return fig
+
+
 def save_gradient_norm_plot(epoch, gradient_norms, save_dir):
     """Save a plot of gradient norms over the batches in an epoch."""
     os.makedirs(save_dir, exist_ok=True)
-    plt.figure(figsize=(10, 6))
-    plt.plot(gradient_norms, label="Gradient Norm")
-    plt.xlabel("Batch Index")
-    plt.ylabel("Gradient Norm")
-    plt.title(f"Gradient Norm Fluctuations (Epoch {epoch + 1})")
-    plt.legend()
-    plt.grid(True)
+    fig = _get_plot_figure("gradient_norms")
+    ax = fig.add_subplot()
+    ax.plot(gradient_norms, label="Gradient Norm")
+    ax.set_xlabel("Batch Index")
+    ax.set_ylabel("Gradient Norm")
+    ax.set_title(f"Gradient Norm Fluctuations (Epoch {epoch + 1})")
+    ax.legend()
+    ax.grid(True)
     plot_path = os.path.join(save_dir, f"gradient_norms_epoch_{epoch + 1}.png")
-    plt.savefig(plot_path)
-    plt.close()
+    fig.savefig(plot_path)
     print(f"Gradient norm plot saved to {plot_path}")
 
 
@@ -153,29 +170,38 @@ def save_loss_plot(epoch, train_steps, train_losses, val_steps, val_losses, save
     :param save_dir: Directory where the loss plot will be saved.
     """
     os.makedirs(save_dir, exist_ok=True)
-    plt.figure(figsize=(10, 6))
-    plt.plot(train_steps, train_losses, label="Training Loss", marker='o', markersize=3)
-    plt.plot(val_steps, val_losses, label="Validation Loss", marker='x', markersize=8, linestyle='--')
-    plt.xlabel("Training Step")
-    plt.ylabel("Loss")
-    plt.title(f"Loss Values (Epoch {epoch + 1})")
-    plt.legend()
-    plt.grid(True)
+    fig = _get_plot_figure("loss")
+    ax = fig.add_subplot()
+    ax.plot(train_steps, train_losses, label="Training Loss", marker='o', markersize=3)
+    ax.plot(val_steps, val_losses, label="Validation Loss", marker='x', markersize=8, linestyle='--')
+    ax.set_xlabel("Training Step")
+    ax.set_ylabel("Loss")
+    ax.set_title(f"Loss Values (Epoch {epoch + 1})")
+    ax.legend()
+    ax.grid(True)
     plot_path = os.path.join(save_dir, f"loss_epoch_{epoch + 1}.png")
-    plt.savefig(plot_path)
-    plt.close()
+    fig.savefig(plot_path)
     print(f"Loss plot saved to {plot_path}")
 
 
+def _validation_autocast_dtype():
+    """
+    bfloat16 when the GPU supports it: same exponent range as float32, so validation
+    needs no loss scaling. Falls back to float16 on older GPUs.
+    """
+    if torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+        return torch.bfloat16
+    return torch.float16
+
 def _run_validation_multi_gpu(model, val_batch, device, use_amp, criterion):
     """
     Runs a validation step using the primary model (for multi GPU training).
     """
-    model.eval()  # Use primary model for validation.
+    model.eval()  # Use primary model for validation (disables dropout).
     with torch.no_grad():
         val_src, val_trg = val_batch
-        val_src, val_trg = val_src.to(device), val_trg.to(device)
-        with torch.amp.autocast(device_type='cuda', enabled=use_amp):
+        val_src, val_trg = val_src.to(device, non_blocking=True), val_trg.to(device, non_blocking=True)
+        with torch.amp.autocast(device_type='cuda', dtype=_validation_autocast_dtype(), enabled=use_amp):
             val_output = model(val_src)
             val_loss = criterion(val_output, val_trg)
     model.train()
@@ -185,11 +211,11 @@ def _run_validation_single_gpu(model, val_batch, device, use_amp, criterion):
     """
     Runs a validation step for a single GPU.
     """
-    model.eval()  # Switch to evaluation mode
+    model.eval()  # Switch to evaluation mode (disables dropout)
     with torch.no_grad():
         val_src, val_trg = val_batch
-        val_src, val_trg = val_src.to(device), val_trg.to(device)
-        with torch.amp.autocast(device_type='cuda', enabled=use_amp):
+        val_src, val_trg = val_src.to(device, non_blocking=True), val_trg.to(device, non_blocking=True)
+        with torch.amp.autocast(device_type='cuda', dtype=_validation_autocast_dtype(), enabled=use_amp):
             val_output = model(val_src)
             val_loss = criterion(val_output, val_trg)
     model.train()  # Switch back to training mode